@@ -10,8 +10,7 @@
 
 from __future__ import print_function
 
-import sys, os, re, glob, argparse, fnmatch
-from   functools import reduce
+import sys, os, re, io, glob, json, mmap, argparse, fnmatch, tempfile, collections
 
 # TODO: We should introduce a high-level tracker/resolver (maybe as
 # catalogue) that does caching. It should basically maintain
@@ -31,8 +30,45 @@ try:
 except ImportError as e:
 	import logging
 
+try:
+	import ahocorasick
+except ImportError as e:
+	ahocorasick = None
+
+try:
+	from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+	import multiprocessing
+except ImportError as e:
+	ThreadPoolExecutor = ProcessPoolExecutor = None
+
 if sys.version_info.major >= 3:
 	unicode = str
+	intern  = sys.intern
+
+def _openText( path ):
+	"""Opens the file at the given path for reading lines as native strings:
+	decoded UTF-8 text on Python 3, bytes on Python 2 so that the parsed names
+	can be used with the (native) string templates."""
+	if sys.version_info.major >= 3:
+		return io.open(path, "r", encoding="utf-8", errors="replace", buffering=1 << 20)
+	else:
+		return open(path, "r", 1 << 20)
+
+def _nativeText( data ):
+	"""Returns the given UTF-8 bytes as a native string, like the lines
+	read from `_openText`: decoded on Python 3, as-is on Python 2."""
+	if sys.version_info.major >= 3:
+		return data.decode("utf-8", "replace")
+	else:
+		return data
+
+def _nativeString( text ):
+	"""Returns the given text (eg. loaded from JSON) as a native string,
+	encoding it as UTF-8 on Python 2."""
+	if sys.version_info.major < 3 and isinstance(text, unicode):
+		return text.encode("utf-8")
+	else:
+		return text
 
 __doc__ = """
 *deparse* extracts/lists and resolves dependencies from a variety of files.
@@ -42,6 +78,33 @@ Tracker are listed as couples `(<type>, <name>)` where type is a string like
 The `deparse` module features both an API and a command-line interface.
 """
 
+# The pool of `(type, name)` items, so that the same dependency found in
+# different files is the same (hashed once) tuple, see `_item`.
+ITEMS = {}
+
+def _item( type, name ):
+	"""Returns the pooled `(type, name)` item, with an interned type."""
+	key = (type, name)
+	res = ITEMS.get(key)
+	if res is None:
+		res = ITEMS[key] = (intern(type) if isinstance(type, str) else type, name)
+	return res
+
+class ResolveContext(object):
+	"""The directories in which `LineParser.resolve` looks for the items
+	required by the file at the given path. Resolving all the items of
+	a file with the same context saves normalizing the paths and
+	querying the current directory for each item."""
+
+	def __init__( self, path, dirs=(), cwd=None ):
+		self.path = path
+		self.cwd  = cwd or os.getcwd()
+		abspath   = os.path.normpath(os.path.join(self.cwd, path))
+		self.dirs = tuple(dirs) + (self.cwd, abspath if os.path.isdir(abspath) else os.path.dirname(abspath))
+		# Maps `(type, id(paths))` to the `LineParser.PATHS` of the type
+		# joined with `dirs`, see `LineParser._typeDirs`.
+		self.typeDirs = {}
+
 class LineParser(object):
 	"""An abstract line-based parser. It looks for lines matching the
 	regular expressions defined the `LINES` map and executes the corresponding
@@ -62,12 +125,130 @@ class LineParser(object):
 		"css:module"  : ["lib/css" , "src/css" , ""],
 		"pcss:module" : ["lib/pcss", "src/pcss", ""],
 	}
+	# The glob patterns for the module types, as `(js or css, sjs or pcss)`,
+	# see `_modulePatterns`.
+	MODULE_PATTERNS = {
+		"js:module"   : (("{0}-*.js",), ("{0}.sjs", "{0}*-*.sjs")),
+		"js:gmodule"  : (("{0}-*.js",), ("{0}*.sjs", "{0}*-*.sjs")),
+		"css:module"  : (("{0}.css",),  ("{0}*.pcss",)),
+	}
+	# The formatted `MODULE_PATTERNS`, see `_modulePatterns`. The cache is
+	# cleared once it holds `MODULE_PATTERNS_CACHE_SIZE` entries.
+	MODULE_PATTERNS_CACHE = {}
+	MODULE_PATTERNS_CACHE_SIZE = 4096
+	# Maps item types to the method that resolves them, see `resolve`.
+	RESOLVERS = {
+		"js:module"     : "_resolveModule",
+		"sjs:module"    : "_resolveModule",
+		"js:gmodule"    : "_resolveGModule",
+		"sjs:gmodule"   : "_resolveGModule",
+		"js:component"  : "_resolveComponent",
+		"sjs:component" : "_resolveComponent",
+		"css:module"    : "_resolveCSSModule",
+		"pcss:module"   : "_resolveCSSModule",
+	}
+	# Bytes that prevent from scanning a file as ASCII bytes, see `_scanPath`.
+	# Text expressions' `\s` also matches the `\x1c-\x1f` separators.
+	RE_NOT_ASCII  = re.compile(b"[\x1c-\x1f\x80-\xff]|\r(?!\n)")
 
 	def __init__( self ):
 		self.path     = None
 		self.type     = None
 		self.provides = []
 		self.requires = []
+		# Maps directories to their list of entries, see `_listdir`. This
+		# can be shared between parsers (as `Tracker` does).
+		self.dirCache = {}
+		if "_LINES_COMPILED" not in self.__class__.__dict__:
+			self.__class__.CompileLines()
+
+	@classmethod
+	def CompileLines( cls ):
+		"""Compiles the `LINES` regular expressions of this class into
+		the `_LINES_COMPILED` map of `{method name:regexp}`, as well as
+		the `_LINES_FUSED` regexp that matches any of them in a single pass,
+		using the method name as group name. This is done once per class,
+		on first instantiation, and should be called again if `LINES` is
+		updated at runtime."""
+		cls._LINES_FUSED    = re.compile("|".join("(?P<{0}>{1})".format(name, expr) for name, expr in cls.LINES.items())) if cls.LINES else None
+		prefixes = [cls.LinePrefix(expr) for expr in cls.LINES.values()]
+		cls._LINES_PREFIXES = tuple(set(prefixes)) if prefixes and all(prefixes) else None
+		# When lines not matching `LINES` are ignored (ie. `parseLine` is
+		# not overridden), the `_LINES_SCANNER` finds the candidate lines
+		# in a whole text, see `_scanText`.
+		stateless = all("parseLine" not in _.__dict__ for _ in cls.__mro__[:cls.__mro__.index(LineParser)])
+		cls._LINES_SCANNER  = re.compile("^(?:{0})".format("|".join("(?:{0})".format(_) for _ in cls.LINES.values())), re.MULTILINE) if cls.LINES and stateless else None
+		cls._LINES_SCANNER_BYTES = re.compile(cls._LINES_SCANNER.pattern.encode("utf-8"), re.MULTILINE) if cls._LINES_SCANNER else None
+		# With `pyahocorasick`, the candidate lines of parsers with prefixes
+		# are found by looking for all the prefixes in a single pass.
+		cls._LINES_AUTOMATON = None
+		if ahocorasick and cls._LINES_SCANNER and cls._LINES_PREFIXES:
+			cls._LINES_AUTOMATON = ahocorasick.Automaton()
+			for _ in cls._LINES_PREFIXES:
+				cls._LINES_AUTOMATON.add_word(_, _)
+			cls._LINES_AUTOMATON.make_automaton()
+		# NOTE: This is assigned last as it tells `__init__` that the class
+		# is compiled, which parsers created in other threads rely on.
+		cls._LINES_COMPILED = dict((name, re.compile(expr)) for name, expr in cls.LINES.items())
+		return cls
+
+	@classmethod
+	def LinePrefix( cls, expr ):
+		"""Returns the literal text that any line matching the given expression
+		must start with once its leading whitespace is stripped, or `None`
+		if the expression does not start with a literal (eg. `^.*url`)."""
+		i = 1 if expr.startswith("^") else 0
+		# We skip the leading whitespace, which parseLine strips.
+		while i < len(expr):
+			if expr[i] in " \t":
+				i += 1
+			elif expr[i:i+2] in ("\\s", "\\t"):
+				i += 2
+			elif expr[i] in "*+" and i > 0:
+				i += 1
+			else:
+				break
+		prefix = ""
+		while i < len(expr):
+			c = expr[i]
+			if c == "\\" and i + 1 < len(expr) and not expr[i+1].isalnum():
+				c  = expr[i+1]
+				i += 2
+			elif c in ".^$*+?{}[]|()\\" or c.isspace():
+				break
+			else:
+				i += 1
+			# A quantifier that allows zero occurences makes the char optional
+			if i < len(expr) and expr[i] in "*?{":
+				break
+			prefix += c
+			if i < len(expr) and expr[i] == "+":
+				break
+		# A top-level alternative would match lines without the prefix. We
+		# skip the escaped chars and the character classes, where `(`, `)`
+		# and `|` are literals.
+		depth   = 0
+		inClass = False
+		j       = 0
+		while j < len(expr):
+			c = expr[j]
+			if c == "\\":
+				j += 1
+			elif inClass:
+				inClass = c != "]"
+			elif c == "[":
+				inClass = True
+				# A leading `]` (or `^]`) is part of the class
+				if expr[j+1:j+2] == "^": j += 1
+				if expr[j+1:j+2] == "]": j += 1
+			elif c == "(":
+				depth += 1
+			elif c == ")":
+				depth -= 1
+			elif c == "|" and depth == 0:
+				return None
+			j += 1
+		return prefix or None
 
 	def parsePath( self, path, type=None ):
 		self.path = path
@@ -75,11 +256,14 @@ class LineParser(object):
 		if not os.path.exists(path):
 			logging.error("{1} parser cannot parse path {0} because it does not exist.".format(path, self.__class__.__name__))
 		else:
-			with open(path) as f:
-				self.onParse(path, type)
-				for line in f.readlines():
-					self.parseLine(line)
-				self.onParseEnd(path, type)
+			self.onParse(path, type)
+			if self._LINES_SCANNER:
+				self._scanPath(path)
+			else:
+				with _openText(path) as f:
+					for line in f:
+						self.parseLine(line)
+			self.onParseEnd(path, type)
 		self.path = None
 		self.type = None
 		return self
@@ -89,8 +273,73 @@ class LineParser(object):
 
 	def parse( self, text, path=None, type=None ):
 		self.onParse(path or self.path, type)
-		for line in text.split("\n"):
-			self.parseLine(line)
+		if self._LINES_SCANNER:
+			self._scanText(text)
+		else:
+			for line in text.split("\n"):
+				self.parseLine(line)
+		return self
+
+	def _scanText( self, text, newlines=False ):
+		"""Passes to `parseLine` only the lines of the given text where one
+		of the `LINES` expression matches, leaving it to the regular
+		expression engine to skip the other lines. Lines include their
+		trailing newline when `newlines` is set."""
+		if self._LINES_AUTOMATON:
+			return self._scanTextAutomaton(text, newlines)
+		search = self._LINES_SCANNER.search
+		match  = search(text)
+		while match:
+			start = match.start()
+			end   = text.find("\n", start)
+			end   = len(text) if end < 0 else end
+			self.parseLine(text[start:end + 1] if newlines else text[start:end])
+			# The match might span over the next lines, so we resume the
+			# search at the next line, which `parseLine` matches on its own.
+			match = search(text, end + 1)
+		return self
+
+	def _scanTextAutomaton( self, text, newlines=False ):
+		"""Like `_scanText`, but passes to `parseLine` the lines containing
+		one of the `_LINES_PREFIXES`, as found by the `_LINES_AUTOMATON`."""
+		parsed = -1
+		for end, prefix in self._LINES_AUTOMATON.iter(text):
+			start = text.rfind("\n", 0, end) + 1
+			# We've already parsed that line
+			if start <= parsed: continue
+			parsed = start
+			end    = text.find("\n", end)
+			end    = len(text) if end < 0 else end
+			self.parseLine(text[start:end + 1] if newlines else text[start:end])
+		return self
+
+	def _scanPath( self, path ):
+		"""Like `_scanText`, but memory-maps the file at the given path and
+		scans its bytes, so that only the candidate lines are decoded. Files
+		with non-ASCII bytes, ASCII separators or old Mac newlines are decoded
+		and scanned as text, as the bytes expressions' classes (`\\w`, `\\s`)
+		only match ASCII. The same goes for parsers with a `_LINES_AUTOMATON`,
+		as `pyahocorasick` automatons only search text."""
+		with open(path, "rb") as f:
+			try:
+				data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+			except ValueError:
+				# Empty files cannot be mapped
+				return self
+		try:
+			if self._LINES_AUTOMATON or self.RE_NOT_ASCII.search(data):
+				text = _nativeText(data[:])
+				return self._scanText(text.replace("\r\n", "\n").replace("\r", "\n"), newlines=True)
+			search = self._LINES_SCANNER_BYTES.search
+			match  = search(data)
+			while match:
+				start = match.start()
+				end   = data.find(b"\n", start)
+				end   = len(data) if end < 0 else end
+				self.parseLine(_nativeText(data[start:end + 1]).replace("\r\n", "\n"))
+				match = search(data, end + 1)
+		finally:
+			data.close()
 		return self
 
 	def normpath( self, path ):
@@ -100,11 +349,15 @@ class LineParser(object):
 		return os.path.normpath(os.path.join(os.path.dirname(self.path), path)) if self.path else os.path.normpath(path)
 
 	def parseLine( self, line ):
-		for name, expr in self.LINES.items():
-			match = re.match(expr, line)
-			if match:
-				getattr(self, name)(line, match)
-				break
+		# The fused expression tells us which of the `LINES` matches first,
+		# and we re-match with that expression only so that the handler
+		# gets the group numbering it expects.
+		if self._LINES_PREFIXES and not line.lstrip().startswith(self._LINES_PREFIXES):
+			return self
+		fused = self._LINES_FUSED and self._LINES_FUSED.match(line)
+		if fused:
+			name = fused.lastgroup
+			getattr(self, name)(line, self._LINES_COMPILED[name].match(line))
 		return self
 
 	def onParse( self, path, type ):
@@ -113,60 +366,119 @@ class LineParser(object):
 	def onParseEnd( self, path, type ):
 		pass
 
-	# FIXME: From an architecture standpoint, this should be pluggable.
-	def resolve( self, item, path, dirs=(), verbose=False ):
+	def resolve( self, item, path, dirs=(), verbose=False, ctx=None ):
 		"""Finds the actual path for the given item `(type, name)`, returning
 		a list of the matching paths (the item might be implemented by more than
-		one file)."""
-		cwd     = os.path.abspath(".")
+		one file). The `ctx` is the `ResolveContext` for `(path, dirs)`, which
+		is created when not given."""
+		ctx     = ctx or ResolveContext(path, dirs)
 		t, name = item
 		res     = []
-		dirs    = [_ for _ in dirs] + [os.getcwd(), os.path.dirname(os.path.abspath(path)) if not os.path.isdir(path) else os.path.abspath(path)]
-		# TODO: Support resolvers
-		if not t or t in ("js:module", "sjs:module"):
-			name = name.replace(".", "/")
-			all_dirs = self._subdirs(dirs, *self.PATHS["js:module"])
-			js_modules  = sorted([("js:module", _) for _ in self._glob(all_dirs, "{0}-*.js".format(name,)) if ".gmodule" not in _])
-			all_dirs = self._subdirs(dirs, *self.PATHS["sjs:module"])
-			sjs_modules = sorted([("sjs:module", _) for _ in self._glob(all_dirs, "{0}.sjs".format(name ),  "{0}*-*.sjs".format(name))])
-			res += sjs_modules if sjs_modules else (js_modules[-1],) if js_modules else ()
-		if not t or t in ("js:gmodule", "sjs:gmodule"):
-			name = name.replace(".", "/")
-			all_dirs = self._subdirs(dirs, *self.PATHS["js:module"])
-			js_modules  = sorted([("js:gmodule", _) for _ in self._glob(all_dirs, "{0}-*.js".format(name)) if ".gmodule" in _])
-			all_dirs = self._subdirs(dirs, *self.PATHS["sjs:module"])
-			sjs_modules = sorted([("sjs:gmodule", _) for _ in self._glob(all_dirs, "{0}*.sjs".format(name), "{0}*-*.sjs".format(name))])
-			res += sjs_modules if sjs_modules else (js_modules[-1],) if js_modules else ()
-		if t and t in ("js:component", "sjs:component"):
-			res += Component.Resolve(item, path ,dirs)
-		if not t or t in ("css:module" ,"pcss:module"):
-			all_dirs = [cwd] + self._subdirs(dirs, *self.PATHS["css:module"])
-			css_modules  = sorted([("css:module",  _) for _ in self._glob(all_dirs, "{0}.css".format(name))])
-			all_dirs = [cwd] + self._subdirs(dirs, *self.PATHS["pcss:module"])
-			pcss_modules = sorted([("pcss:module", _) for _ in self._glob(all_dirs, "{0}*.pcss".format(name))])
-			res += pcss_modules if pcss_modules else (css_modules[-1],) if css_modules else ()
-		if not t or t.endswith(":file"):
-			altname = name + ("." + t.split(":",1)[0] if t else "")
-			ext     = name.rsplit(".", 1)[-1]
-			visited = []
-			for n in (name, altname, "lib/" + ext + "/" + name, "lib/" + ext + "/", altname):
-				for d in dirs:
-					p = os.path.join(d, n)
-					if p not in visited and os.path.exists(p):
-						res.append(("*:file", p))
-						visited.append(p)
-		if t and t.endswith(":url"):
+		dirs    = [_ for _ in ctx.dirs]
+		if t in self.RESOLVERS:
+			res += getattr(self, self.RESOLVERS[t])(item, name, dirs, ctx)
+		elif t and t.endswith(":file"):
+			res += self._resolveFile(item, name, dirs, ctx)
+		elif t and t.endswith(":url"):
 			res.append(item)
+		elif not t:
+			# NOTE: Untyped items are looked up as all the module types, the
+			# name being then looked up as a path (`a.b` as `a/b`).
+			res += self._resolveModule(item, name, dirs, ctx)
+			res += self._resolveGModule(item, name, dirs, ctx)
+			name = self._modulePatterns("js:module", name)[0]
+			res += self._resolveCSSModule(item, name, dirs, ctx)
+			res += self._resolveFile(item, name, dirs, ctx)
 		res = self._resolve( res, item, path, dirs=() )
 		if verbose and not res:
 			logging.error("Unresolved item in {0}: {1} at {2}".format(self.__class__.__name__, item, path))
-		res = reduce(lambda x,y:x + [y] if y not in x else x, res, [])
+		seen = set()
+		res  = [_ for _ in res if not (_ in seen or seen.add(_))]
+		return res
+
+	def _resolveModule( self, item, name, dirs, ctx ):
+		"""Resolves `js:module` and `sjs:module` items, preferring Sugar sources
+		over the latest JavaScript version."""
+		name, js_patterns, sjs_patterns = self._modulePatterns("js:module", name)
+		all_dirs = self._typeDirs("js:module", ctx)
+		js_modules  = sorted([("js:module", _) for _ in self._glob(all_dirs, *js_patterns) if ".gmodule" not in _])
+		all_dirs = self._typeDirs("sjs:module", ctx)
+		sjs_modules = sorted([("sjs:module", _) for _ in self._glob(all_dirs, *sjs_patterns)])
+		return sjs_modules if sjs_modules else [js_modules[-1]] if js_modules else []
+
+	def _resolveGModule( self, item, name, dirs, ctx ):
+		"""Resolves `js:gmodule` and `sjs:gmodule` items."""
+		name, js_patterns, sjs_patterns = self._modulePatterns("js:gmodule", name)
+		all_dirs = self._typeDirs("js:module", ctx)
+		js_modules  = sorted([("js:gmodule", _) for _ in self._glob(all_dirs, *js_patterns) if ".gmodule" in _])
+		all_dirs = self._typeDirs("sjs:module", ctx)
+		sjs_modules = sorted([("sjs:gmodule", _) for _ in self._glob(all_dirs, *sjs_patterns)])
+		return sjs_modules if sjs_modules else [js_modules[-1]] if js_modules else []
+
+	def _resolveComponent( self, item, name, dirs, ctx ):
+		"""Resolves `js:component` and `sjs:component` items, see `Component`."""
+		return Component.Resolve(item, ctx.path, dirs)
+
+	def _resolveCSSModule( self, item, name, dirs, ctx ):
+		"""Resolves `css:module` and `pcss:module` items, preferring PCSS sources
+		over the latest CSS file."""
+		name, css_patterns, pcss_patterns = self._modulePatterns("css:module", name)
+		all_dirs = [ctx.cwd] + self._typeDirs("css:module", ctx)
+		css_modules  = sorted([("css:module",  _) for _ in self._glob(all_dirs, *css_patterns)])
+		all_dirs = [ctx.cwd] + self._typeDirs("pcss:module", ctx)
+		pcss_modules = sorted([("pcss:module", _) for _ in self._glob(all_dirs, *pcss_patterns)])
+		return pcss_modules if pcss_modules else [css_modules[-1]] if css_modules else []
+
+	def _resolveFile( self, item, name, dirs, ctx ):
+		"""Resolves `*:file` items, looking for the name as-is, with the
+		type's extension and in the `lib/<ext>` directories."""
+		t       = item[0]
+		res     = []
+		altname = name + ("." + t.split(":",1)[0] if t else "")
+		ext     = name.rsplit(".", 1)[-1]
+		visited = []
+		for n in (name, altname, "lib/" + ext + "/" + name, "lib/" + ext + "/", altname):
+			for d in dirs:
+				p = os.path.join(d, n)
+				if p not in visited and os.path.exists(p):
+					res.append(_item("*:file", p))
+					visited.append(p)
 		return res
 
 	def _resolve( self, resolved, item, path, dirs ):
 		"""Can be overriden to update the result of `resolve`."""
 		return resolved
 
+	def _modulePatterns( self, type, name ):
+		"""Returns `(name, patterns, patterns)` where the patterns are the
+		`MODULE_PATTERNS` for the given type, formatted with the given module
+		name. JavaScript module names are converted to paths (`a.b` to `a/b`),
+		which is the returned name. Results are cached in `MODULE_PATTERNS_CACHE`,
+		by `MODULE_PATTERNS` table as subclasses might override it."""
+		key   = (id(self.MODULE_PATTERNS), type, name)
+		cache = self.MODULE_PATTERNS_CACHE
+		res   = cache.get(key)
+		if res is None:
+			if type.startswith("js:"):
+				name = name.replace(".", "/")
+			res = (name,) + tuple(tuple(_.format(name) for _ in patterns) for patterns in self.MODULE_PATTERNS[type])
+			if len(cache) >= self.MODULE_PATTERNS_CACHE_SIZE:
+				cache.clear()
+			cache[key] = res
+		return res
+
+	def _typeDirs( self, type, ctx ):
+		"""Returns the directories where items of the given type are looked
+		for, ie. the `PATHS` of the type joined with the context's `dirs`,
+		which are computed once per context. As contexts can be shared by
+		parsers with different `PATHS`, they are cached by `PATHS` list."""
+		paths = self.PATHS[type]
+		key   = (type, id(paths))
+		res   = ctx.typeDirs.get(key)
+		if res is None:
+			res = ctx.typeDirs[key] = self._subdirs(ctx.dirs, *paths)
+		return res
+
 	def _subdirs( self, dirs, *subdirs):
 		"""Returns `len(dirs) * len(subdirs)` directories where each `subdir` is joined
 		with all the `dirs`."""
@@ -177,13 +489,41 @@ class LineParser(object):
 		return res
 
 	def _glob( self, dirs, *expressions ):
+		"""Like `glob.glob`, but matches the expressions' base names against
+		the cached directory listings returned by `_listdir`."""
 		matches = []
-		for d in dirs:
-			for e in expressions:
-				p = os.path.join(d, e)
-				matches += glob.glob(p)
+		for e in expressions:
+			for d in dirs:
+				parent, pattern = os.path.split(os.path.join(d, e))
+				if glob.has_magic(parent):
+					matches += glob.glob(os.path.join(parent, pattern))
+					continue
+				names = self._listdir(parent or os.curdir)
+				if not glob.has_magic(pattern):
+					names = [pattern] if pattern in names else []
+				else:
+					names = fnmatch.filter(names, pattern)
+					if not pattern.startswith("."):
+						names = [_ for _ in names if not _.startswith(".")]
+				matches += [os.path.join(parent, _) for _ in names]
 		return sorted(matches)
 
+	def _listdir( self, path ):
+		"""Returns the entries of the directory at the given path, listing it
+		only once per `dirCache`. Missing directories have no entries."""
+		res = self.dirCache.get(path)
+		if res is None:
+			try:
+				if hasattr(os, "scandir"):
+					with os.scandir(path) as entries:
+						res = [_.name for _ in entries]
+				else:
+					res = os.listdir(path)
+			except OSError:
+				res = []
+			self.dirCache[path] = res
+		return res
+
 	def export( self ):
 		return dict(
 			path=self.path,
@@ -206,10 +546,10 @@ class C(LineParser):
 
 	def onParse( self, path, type ):
 		module = os.path.basename(path).rsplit("-",1)[0]
-		self.provides = [("c:header", module)]
+		self.provides = [_item("c:header", module)]
 
 	def onInclude( self, line, match ):
-		self.requires.append(("c:header",match.group(1)))
+		self.requires.append(_item("c:header",match.group(1)))
 
 # -----------------------------------------------------------------------------
 #
@@ -231,19 +571,19 @@ class JavaScript(LineParser):
 	def onParse( self, path, type ):
 		if path:
 			module  = os.path.basename(path).rsplit("-",1)[0]
-			self.provides = [(self.type or "js:module", module)]
+			self.provides = [_item(self.type or "js:module", module)]
 		else:
 			self.provdes = []
 
 	def onRequire( self, line, match ):
 		decl, name, module, __, symbol, __, subsymbol = match.groups()
-		self.requires.append((self.type or "js:module", module))
+		self.requires.append(_item(self.type or "js:module", module))
 
 	def onGoogleProvide( self, line, match ):
-		self.provides.append(("js:gmodule", match.group(1)))
+		self.provides.append(_item("js:gmodule", match.group(1)))
 
 	def onGoogleRequire( self, line, match ):
-		self.requires.append(("js:gmodule", match.group(1)))
+		self.requires.append(_item("js:gmodule", match.group(1)))
 
 	def onImport( self, line, match ):
 		module = match.groups()[-1]
@@ -251,9 +591,9 @@ class JavaScript(LineParser):
 			return
 		if module.startswith("."):
 			path = os.path.normpath(os.path.join(os.path.dirname(self.path or "."), module))
-			self.requires.append(("js:file", path))
+			self.requires.append(_item("js:file", path))
 		else:
-			self.requires.append((self.type or "js:module", module))
+			self.requires.append(_item(self.type or "js:module", module))
 
 # -----------------------------------------------------------------------------
 #
@@ -287,7 +627,7 @@ class Sugar(LineParser):
 		# 	self.requires.insert(0, (self.type or "js:module", "extend"))
 
 	def onModule( self, line, match ):
-		self.provides.append((self.type or "js:module",match.group(1)))
+		self.provides.append(_item(self.type or "js:module",match.group(1)))
 
 	def onSugar2( self, line, match ):
 		self.version = 2
@@ -298,7 +638,7 @@ class Sugar(LineParser):
 		for _ in line.split(","):
 			_ = _.strip().split()[0]
 			if _:
-				self.requires.append((self.type or "js:module",_))
+				self.requires.append(_item(self.type or "js:module",_))
 
 # -----------------------------------------------------------------------------
 #
@@ -365,11 +705,12 @@ class Paml(LineParser):
 
 	def _parseAttributes( self, attributes ):
 		# NOTE: Borrowed and adapted from paml.engine.Parser._parsePAMLAttributes
+		# NOTE: We iterate on the attributes in a single pass, making sure
+		# that the matches are only separated by commas.
 		result   = []
-		original = attributes
-		while attributes:
-			match  = self.RE_ATTRIBUTE.match(attributes)
-			assert match, "Given attributes are malformed: %s" % (attributes)
+		offset   = 0
+		for match in self.RE_ATTRIBUTE.finditer(attributes):
+			assert match.start() == offset, "Given attributes are malformed: %s" % (attributes[offset:])
 			name  = match.group(1)
 			value = match.group(4)
 			# handles '::' syntax for namespaces
@@ -377,11 +718,12 @@ class Paml(LineParser):
 			if value and value[0] == value[-1] and value[0] in ("'", '"'):
 				value = value[1:-1]
 			result.append([name, value])
-			attributes = attributes[match.end():]
-			if attributes:
-				assert attributes[0] == ",", "Attributes must be comma-separated: %s" % (attributes)
-				attributes = attributes[1:]
-				assert attributes, "Trailing comma with no remaining attributes: %s" % (original)
+			offset = match.end()
+			if offset < len(attributes):
+				assert attributes[offset] == ",", "Attributes must be comma-separated: %s" % (attributes[offset:])
+				offset += 1
+				assert offset < len(attributes), "Trailing comma with no remaining attributes: %s" % (attributes)
+		assert offset == len(attributes), "Given attributes are malformed: %s" % (attributes[offset:])
 		return dict((k,v) for k,v in result)
 
 	def onLinkTag( self, line, match ):
@@ -389,19 +731,19 @@ class Paml(LineParser):
 		url = attrs.get("href")
 		if attrs.get("rel") == "stylesheet" and url:
 			if "://" in url:
-				self.requires.append(("css:url",  url))
+				self.requires.append(_item("css:url",  url))
 			else:
-				self.requires.append(("css:file", url))
+				self.requires.append(_item("css:file", url))
 
 	def onJavaScriptTag( self, line, match ):
 		src = line.split("src=",1)[1].split(",")[0].split(")")[0]
 		if src[0] == src[-1] and src[0] in '"\'': src = src[1:-1]
-		self.requires.append(("js:file", src))
+		self.requires.append(_item("js:file", src))
 
 	def onJavaScriptRequire( self, line, match, type="js:module"):
 		reqs = line.split("(",1)[1].rsplit(")",1)[0].split(",")
 		for name in reqs:
-			self.requires.append((type, name))
+			self.requires.append(_item(type, name))
 
 	def onJavaScriptGModule( self, line, match ):
 		return self.onJavaScriptRequire(line, match, type="js:gmodule")
@@ -413,7 +755,7 @@ class Paml(LineParser):
 		component = match.group(1).strip()
 		if component[0] == component[-1] and component[-1] in "'\"":
 			component = component[1:-1]
-		self.requires.append(("js:component", component))
+		self.requires.append(_item("js:component", component))
 
 	def onInclude( self, line, match ):
 		line = line[len(match.group()):]
@@ -422,7 +764,7 @@ class Paml(LineParser):
 		type = "paml:file"
 		if line.endswith(".svg"):
 			type = "*:file"
-		self.requires.append((type, line))
+		self.requires.append(_item(type, line))
 
 # -----------------------------------------------------------------------------
 #
@@ -443,13 +785,13 @@ class CSS(LineParser):
 	def onImport( self, line, match ):
 		path = match.group(1).strip()
 		if path[0] == path[-1] and path[0] in '"\'': path = path[1:-1]
-		self.requires.append(("css:file", self.normpath(path)))
+		self.requires.append(_item("css:file", self.normpath(path)))
 
 	def onURL( self, line, match ):
 		url = match.group(1)
 		if url[0] == url[-1] and url[0] in "\"'": url = url[1:-1]
 		if url.startswith("file://"): url = url[7:]
-		self.requires.append(("*", url if "://" in url else self.normpath(url.split("?",1)[0].split("#",1)[0])))
+		self.requires.append(_item("*", url if "://" in url else self.normpath(url.split("?",1)[0].split("#",1)[0])))
 
 # -----------------------------------------------------------------------------
 #
@@ -470,16 +812,16 @@ class PCSS(CSS):
 	}
 
 	def onModule( self, line, match ):
-		self.provides.append(("pcss:module",match.group(1)))
+		self.provides.append(_item("pcss:module",match.group(1)))
 
 	def onInclude( self, line, match ):
 		path = match.group(1).strip()
-		self.requires.append(("pcss:file", self.normpath(path)))
+		self.requires.append(_item("pcss:file", self.normpath(path)))
 
 	def onImport( self, line, match ):
 		path = match.group(1).strip()
 		if path[0] == path[-1] and path[0] in '"\'': path = path[1:-1]
-		self.requires.append(("css:module", self.normpath(path)))
+		self.requires.append(_item("css:module", self.normpath(path)))
 
 # -----------------------------------------------------------------------------
 #
@@ -516,9 +858,9 @@ class Block(LineParser):
 			elif name == "pcss":
 				parser = PCSS()
 			elif name == "import":
-				self.requires += [("{0}:file".format(_.rsplit(".",1)[-1]), _.strip()) for _ in params.split(" ") if _.strip()]
+				self.requires += [_item("{0}:file".format(_.rsplit(".",1)[-1]), _.strip()) for _ in params.split(" ") if _.strip()]
 			elif name == "component":
-				self.requires += [("component", _.strip()) for _ in params.split(" ") if _.strip()]
+				self.requires += [_item("component", _.strip()) for _ in params.split(" ") if _.strip()]
 			# TODO: Texto
 			if parser:
 				parser.parse("\n".join(lines), path=path)
@@ -570,13 +912,13 @@ class Component(LineParser):
 				for t,f in cls.OPTIONS["files"]:
 					p = os.path.join(d, f)
 					if os.path.exists(p):
-						res.append((t,p))
+						res.append(_item(t,p))
 		return res
 
 	def __init__( self ):
 		super(Component, self).__init__()
 
-	def resolve( self, item, path, dirs=(), verbose=False ):
+	def resolve( self, item, path, dirs=(), verbose=False, ctx=None ):
 		return self.Resolve(item, path, dirs)
 
 # -----------------------------------------------------------------------------
@@ -588,14 +930,38 @@ class Component(LineParser):
 class Tracker(object):
 	"""Extracts and aggregates dependencies."""
 
-	def __init__( self ):
+	# The version of the parse cache format, to be bumped whenever the
+	# parsers' results change (eg. `LINES` or handlers are updated), so
+	# that the existing parse caches are dropped.
+	CACHE_VERSION = 1
+
+	def __init__( self, cachePath=None, workers=None, processes=False ):
 		self.PARSERS   = PARSERS
 		self.provides  = []
 		self.requires  = []
 		self.paths     = []
+		# The number of threads (or processes when `processes` is set)
+		# parsing files. By default, files are parsed in the current thread,
+		# or by as many processes as CPUs when `processes` is set.
+		self.workers   = (None if processes else 1) if workers is None else workers
+		self.processes = processes
 		self.resolved  = {}
 		self.nodes     = {}
+		self.dirCache  = {}
+		# Sets of the elements in `paths`, `requires`, `nodes[name]` and
+		# `resolved[item]`, so that membership tests do not scan the lists.
+		self._requiresSeen = set()
+		self._pathsSeen    = set()
+		self._nodesSeen    = {}
+		self._resolvedSeen = {}
 		self._resolver = None
+		self._executor = None
+		self._cwd      = os.getcwd()
+		# The parse cache maps absolute paths to the `provides`/`requires`
+		# of the file, along with its `type`, modification time and size.
+		self.cachePath = cachePath
+		self.cache     = self._loadCache(cachePath) if cachePath else {}
+		self._cacheUpdated = False
 
 	def fromPath( self, path, recursive=False ):
 		"""Lists the dependencies at the given path in import priority. This
@@ -614,7 +980,13 @@ class Tracker(object):
 
 		if the file `lib/js/jquery.js+lodash.js` does not exists.
 		"""
-		self._fromPath(path, recursive=recursive)
+		try:
+			self._fromPath(path, recursive=recursive)
+		finally:
+			if self._executor:
+				self._executor.shutdown()
+				self._executor = None
+		self._saveCache()
 		return {
 			"provides":self.provides,
 			"resolved":self.resolved,
@@ -622,107 +994,312 @@ class Tracker(object):
 		}
 
 	def _fromPath( self, path, recursive=False, type=None ):
-		"""Helper function of the `Tracker.fromPath` method. Gets a parser
-		for the given file type, parses the file at the given path and
-		merges the `Parser.provides`/`Parser.requires`.
+		"""Helper function of the `Tracker.fromPath` method. Walks the
+		dependencies breadth-first: the files of each frontier are parsed
+		as a batch (see `_parsePaths`), then their `Parser.provides`/`Parser.requires`
+		are merged and resolved in order, giving the next frontier.
 		"""
+		frontier = [(path, type)]
+		while frontier:
+			batch = []
+			for path, type in frontier:
+				batch += self._expandPath(path, type)
+			frontier = []
+			for path, type, parser in self._parsePaths(batch):
+				ctx = ResolveContext(path, cwd=self._cwd)
+				self.provides.append((path, parser.provides))
+				self.requires = self._merge(self.requires, parser.requires, self._requiresSeen)
+				# We register/update the provided nodes
+				for name in parser.provides:
+					if name not in self.nodes:
+						self.nodes[name] = []
+						self._nodesSeen[name] = set()
+					self.nodes[name] = self._merge(self.nodes[name], parser.requires, self._nodesSeen[name])
+				# We iterate on the dependency, trying to resolve them
+				for dependency in parser.requires:
+					# We don't resolve URLs (yet)
+					dependency_type = dependency[0]
+					if dependency_type.endswith(":url"):
+						continue
+					resolved = self.resolve(parser, dependency, path, ctx=ctx)
+					if recursive:
+						# FIXME: Support url
+						# if not resolved and "://" not in dependency[1]:
+						# 	logging.error("Cannot recurse on {0} in {1}: dependency {0} cannot be resolved".format(dependency, path))
+						for dependency_type, dependency_path in resolved:
+							frontier.append((dependency_path, dependency_type))
+		return self
+
+	def _expandPath( self, path, type=None ):
+		"""Returns the list of `(path, type, parserType)` to be parsed for
+		the given path, registering them in `paths` so that they are
+		parsed only once."""
 		if not os.path.exists(path) and "+" in path:
 			# We're given a  '+'-separated list of paths, so we split it
 			paths  = path.split("+")
 			prefix = os.path.dirname(paths[0])
 			paths  = [paths[0]] + [os.path.join(prefix, _) for _ in paths[1:]]
-			return [self._fromPath(_, recursive=recursive, item=item) for _ in paths]
-		elif path in self.paths:
-			# We've already scanned that path, so we return as-is
-			return self
+			return [_ for p in paths for _ in self._expandPath(p, type)]
+		elif path in self._pathsSeen:
+			# We've already scanned that path, so we skip it
+			return []
 		elif os.path.isdir(path):
 			# We skip directories
-			pass
+			return []
 		else:
 			# We add the path to prevent infinite recursion
 			self.paths.append(path)
+			self._pathsSeen.add(path)
 			# Now we find a parser for the extension
 			ext         = path.rsplit(".",1)[-1].lower()
 			parser_type = self.PARSERS.get(ext)
 			# We return and log an error if there's no matching parser
 			if not parser_type:
 				logging.error("Parser not defined for type `{0}` in: {1}".format(ext, path))
-				return
-			# We do the parsing, merging back the provided and required elements.
-			parser      = parser_type().parsePath(path, type=type)
-			self.provides.append((path, parser.provides))
-			self.requires = self._merge(self.requires, parser.requires)
-			# We register/update the provided nodes
-			for name in parser.provides:
-				if name not in self.nodes: self.nodes[name] = []
-				self.nodes[name] = self._merge(self.nodes[name], parser.requires)
-			# We iterate on the dependency, trying to resolve them
-			for dependency in parser.requires:
-				# We don't resolve URLs (yet)
-				dependency_type = dependency[0]
-				if dependency_type.endswith(":url"):
-					continue
-				resolved = self.resolve(parser, dependency, path)
-				if recursive:
-					# FIXME: Support url
-					# if not resolved and "://" not in dependency[1]:
-					# 	logging.error("Cannot recurse on {0} in {1}: dependency {0} cannot be resolved".format(dependency, path))
-					for dependency_type, dependency_path in resolved:
-						self._fromPath(dependency_path, recursive=recursive, type=dependency_type)
+				return []
+			return [(path, type, parser_type)]
+
+	def _parsePaths( self, batch ):
+		"""Parses the given list of `(path, type, parserType)` and returns the
+		corresponding `(path, type, parser)`. Files that are not in the
+		parse cache are read and parsed by a pool of `workers` threads, so
+		that reading a file overlaps with parsing the others, or by a pool
+		of processes when `processes` is set, so that parsing is not bound
+		by the GIL."""
+		res     = []
+		pending = []
+		for path, type, parser_type in batch:
+			parser = parser_type()
+			parser.dirCache = self.dirCache
+			# We parse the file unless it is unchanged since it was cached
+			if not self._fromCache(parser, path, type):
+				pending.append((parser, path, type))
+			res.append((path, type, parser))
+		if len(pending) > 1 and self.workers != 1 and ThreadPoolExecutor:
+			if self.processes:
+				# Parsers are created again in the worker processes, we
+				# only get back their provides/requires.
+				parsed = self._getExecutor().map(_parsePath, [(parser.__class__, path, type) for parser, path, type in pending])
+				for (parser, path, type), (provides, requires) in zip(pending, parsed):
+					parser.provides = [_item(*_) for _ in provides]
+					parser.requires = [_item(*_) for _ in requires]
+			else:
+				for _ in self._getExecutor().map(lambda _:_[0].parsePath(_[1], type=_[2]), pending):
+					pass
+		else:
+			for parser, path, type in pending:
+				parser.parsePath(path, type=type)
+		for parser, path, type in pending:
+			self._toCache(parser, path, type)
+		return res
+
+	def _getExecutor( self ):
+		"""Returns the executor used by `_parsePaths`, which is created on
+		first use and shut down at the end of `fromPath`."""
+		if not self._executor:
+			if self.processes:
+				# Forking saves re-importing the module in each process. Before
+				# Python 3.7 (and with the Python 2 `futures` backport), the
+				# executor has no `mp_context` and forks on POSIX anyway.
+				if sys.version_info >= (3, 7) and "fork" in multiprocessing.get_all_start_methods():
+					self._executor = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context("fork"))
+				else:
+					self._executor = ProcessPoolExecutor(self.workers)
+			else:
+				self._executor = ThreadPoolExecutor(self.workers)
+		return self._executor
+
+	def _loadCache( self, path ):
+		"""Loads the parse cache stored at the given path, returning an
+		empty cache if it does not exist, cannot be read or was saved
+		with another `CACHE_VERSION`."""
+		if not os.path.exists(path):
+			return {}
+		try:
+			with open(path) as f:
+				data = json.load(f)
+		except (IOError, OSError, ValueError) as e:
+			logging.error("Cannot load parse cache {0}: {1}".format(path, e))
+			return {}
+		if not isinstance(data, dict) or data.get("version") != self.CACHE_VERSION:
+			return {}
+		return data.get("files") or {}
+
+	def _saveCache( self ):
+		"""Saves the parse cache to `cachePath`, if it was updated. The cache
+		is written to a temporary file that then replaces `cachePath`, so that
+		an interrupted save does not leave a truncated cache."""
+		if not (self.cachePath and self._cacheUpdated):
+			return
+		parent, name = os.path.split(os.path.abspath(self.cachePath))
+		try:
+			fd, path = tempfile.mkstemp(prefix=name + ".", suffix=".tmp", dir=parent)
+		except (IOError, OSError) as e:
+			logging.error("Cannot save parse cache {0}: {1}".format(self.cachePath, e))
+			return
+		try:
+			with os.fdopen(fd, "w") as f:
+				json.dump(dict(version=self.CACHE_VERSION, files=self.cache), f)
+			# NOTE: `os.rename` does not replace existing files on Windows
+			getattr(os, "replace", os.rename)(path, self.cachePath)
+			self._cacheUpdated = False
+		except (IOError, OSError) as e:
+			logging.error("Cannot save parse cache {0}: {1}".format(self.cachePath, e))
+			if os.path.exists(path):
+				os.unlink(path)
+
+	def _cacheKey( self, parser, path, type ):
+		"""Returns the `(key, stamp)` identifying the current state of the
+		file at the given path in the parse cache. The path is part of the
+		stamp as parsers normalize relative dependencies against it, and so
+		is the parser class. Returns `(None, None)` when the file cannot be
+		stat'ed (eg. it does not exist), in which case it is not cached."""
+		try:
+			stat = os.stat(path)
+		except OSError:
+			return None, None
+		return os.path.abspath(path), [path, type, parser.__class__.__name__, getattr(stat, "st_mtime_ns", stat.st_mtime), stat.st_size]
+
+	def _fromCache( self, parser, path, type ):
+		"""Sets the `provides`/`requires` of the given parser from the
+		parse cache, returning `True` if the cache entry was up to date."""
+		if not self.cachePath:
+			return False
+		key, stamp = self._cacheKey(parser, path, type)
+		entry      = self.cache.get(key) if key else None
+		if not entry or entry["stamp"] != stamp:
+			return False
+		parser.provides = [_item(_nativeString(t), _nativeString(n)) for t, n in entry["provides"]]
+		parser.requires = [_item(_nativeString(t), _nativeString(n)) for t, n in entry["requires"]]
+		return True
+
+	def _toCache( self, parser, path, type ):
+		"""Stores the `provides`/`requires` of the given parser in the
+		parse cache."""
+		if not self.cachePath:
+			return
+		key, stamp = self._cacheKey(parser, path, type)
+		if not key:
+			return
+		self.cache[key] = dict(
+			stamp=stamp,
+			provides=parser.provides,
+			requires=parser.requires,
+		)
+		self._cacheUpdated = True
 
 	# FIXME: Architecturally, this is a helper function and should be moved
 	# out of the class if used elsewhere.
-	def _merge( self, a, b ):
+	def _merge( self, a, b, seen=None ):
 		"""Merges the elemetns of B into A, only if the elements
-		are not arelady in A."""
+		are not arelady in A. The `seen` set holds the elements of A and
+		is updated along, it is created from A when not given."""
+		seen = set(a) if seen is None else seen
 		for e in b:
-			if e not in a:
+			if e not in seen:
 				a.append(e)
+				seen.add(e)
 		return a
 
-	def resolve( self, parser, item, path ):
+	def resolve( self, parser, item, path, ctx=None ):
 		"""Finds the actual path for the given item `(type, name)`, returning
 		a list of the matching (type, paths) (the item might be implemented by more than
 		one file)."""
 		# We resolve with the parser first
-		res = [_ for _ in parser.resolve(item, path)] or ()
+		res = parser.resolve(item, path, ctx=ctx) or ()
 		t, name = item
 		# If we haven't found anything, we use the resolver
 		if not res:
 			if not self._resolver:
-				self._resolver = Resolver(self.PARSERS)
-			r = self._resolver.find([item], path)
+				self._resolver = Resolver(self.PARSERS, dirCache=self.dirCache)
+			r = self._resolver.find([item], path, ctx=ctx)
 			if name in r:
 				res = r[name]
 		# NOTE: We hash on the *item* as a symbol might have more than one file
-		if item not in self.resolved:
+		if item in self.resolved:
+			self.resolved[item] = self._merge(self.resolved[item], res, self._resolvedSeen[item])
+		elif os.path.exists(item[1]):
 			# If the item path exists (but does not have a parser), then
 			# we add it as resolved.
-			self.resolved[item] = [item] if os.path.exists(item[1]) else []
-		self.resolved[item] = self._merge(self.resolved[item], res)
+			self._resolvedSeen[item] = set((item,))
+			self.resolved[item] = self._merge([item], res, self._resolvedSeen[item])
+		else:
+			# The results are already deduplicated, so there is nothing to merge
+			self.resolved[item] = [_ for _ in res]
+			self._resolvedSeen[item] = set(res)
 		return res
 
 	def _sortRequires( self, requires ):
 		"""Sorts the given list of requirements so that the given list is
-		returned in loading order."""
-		loaded = []
+		returned in loading order. This is a topological sort (Kahn's algorithm)
+		over `self.nodes`. When the remaining modules are all part of or
+		depend on a dependency cycle, they are loaded in depth-first
+		post-order, so that modules still come after their dependencies
+		outside of the cycles."""
 		requires = sorted(requires, key=lambda _:len(self.nodes.get(_) or ()))
-		def load(module, loaded=loaded):
-			if module in loaded: return
-			index = len(loaded)
+		# We collect the modules reachable from the requirements
+		modules  = []
+		visited  = set()
+		queue    = collections.deque()
+		for module in requires:
+			if module not in visited:
+				visited.add(module)
+				queue.append(module)
+			while queue:
+				module = queue.popleft()
+				modules.append(module)
+				for required in self.nodes.get(module) or ():
+					if required not in visited:
+						visited.add(required)
+						queue.append(required)
+		# We build the reverse dependencies and count the dependencies
+		reverse   = {}
+		in_degree = {}
+		for module in modules:
+			# NOTE: This is a bug, the modules should not import themselves
+			required = set(self.nodes.get(module) or ()) - set((module,))
+			in_degree[module] = len(required)
+			for _ in required:
+				reverse.setdefault(_, []).append(module)
+		loaded = []
+		done   = set()
+		queue  = collections.deque(_ for _ in modules if not in_degree[_])
+		while queue:
+			module = queue.popleft()
+			done.add(module)
 			loaded.append(module)
-			for required in self.nodes.get(module) or ():
-				# NOTE: This is a bug, the modules should not import themselves
-				if required == module: continue
-				load(required, loaded)
-			del loaded[index]
-			if module not in loaded:
-				loaded.append(module)
-			return loaded
-		for _ in requires:
-			load(_)
+			for dependent in reverse.get(module) or ():
+				in_degree[dependent] -= 1
+				if not in_degree[dependent]:
+					queue.append(dependent)
+		# We're left with the cycles and the modules that depend on them,
+		# which we load in depth-first post-order, dependencies first. A
+		# module being visited is skipped, which breaks the cycles.
+		visiting = set()
+		for module in modules:
+			if module in done or module in visiting: continue
+			visiting.add(module)
+			stack = [(module, iter(self.nodes.get(module) or ()))]
+			while stack:
+				module, required = stack[-1]
+				for _ in required:
+					if _ not in done and _ not in visiting:
+						visiting.add(_)
+						stack.append((_, iter(self.nodes.get(_) or ())))
+						break
+				else:
+					stack.pop()
+					done.add(module)
+					loaded.append(module)
 		return loaded
 
+def _parsePath( args ):
+	"""Parses the file with the given `(parserType, path, type)`, returning its
+	`(provides, requires)`. This is used by `Tracker` worker processes."""
+	parser_type, path, type = args
+	parser = parser_type().parsePath(path, type=type)
+	return parser.provides, parser.requires
+
 # -----------------------------------------------------------------------------
 #
 # RESOLVER
@@ -732,28 +1309,41 @@ class Tracker(object):
 class Resolver(object):
 	"""Resolves (symbol) names into files."""
 
-	def __init__( self, parsers=None ):
+	def __init__( self, parsers=None, dirCache=None ):
 		super(Resolver, self).__init__()
-		self.PARSERS = parsers or PARSERS
-		self.paths = []
+		self.PARSERS  = parsers or PARSERS
+		self.paths    = []
+		self.dirCache = {} if dirCache is None else dirCache
 
 	def addPath( self, path ):
 		self.paths.append(path)
 		return self
 
-	def find( self, elements, path=None ):
-		parsers = [(_, self.PARSERS[_]()) for _ in self.PARSERS]
+	def find( self, elements, path=None, ctx=None ):
+		# A parser class registered for more than one extension (eg. `C`)
+		# gives the same results, so we only keep one parser per class.
+		parsers = []
+		types   = set()
+		for parser_type in self.PARSERS.values():
+			if parser_type not in types:
+				types.add(parser_type)
+				parsers.append(parser_type())
 		matches = {}
+		seen    = {}
+		for p in parsers: p.dirCache = self.dirCache
 		path    = path or os.getcwd()
+		ctx     = ctx or ResolveContext(path, self.paths)
 		if isinstance(elements, str) or isinstance(elements, unicode): elements=[elements]
 		for element in elements:
 			if isinstance(element, tuple): element = element[1]
-			for t,p in parsers:
-				matches.setdefault(element,[])
+			matches.setdefault(element,[])
+			seen.setdefault(element, set())
+			for p in parsers:
 				# We ensure an element is not present twice
-				for _ in p.resolve((None,element), path, self.paths):
-					if _ not in matches[element]:
+				for _ in p.resolve((None,element), path, self.paths, ctx=ctx):
+					if _ not in seen[element]:
 						matches[element].append(_)
+						seen[element].add(_)
 		return matches
 
 # -----------------------------------------------------------------------------
@@ -12,11 +12,11 @@
 import sys, os, argparse, fnmatch
 from .core import logging, Tracker, Resolver, find, PARSERS
 
-def run( args, recursive=False, mode=Tracker ):
+def run( args, recursive=False, mode=Tracker, cache=None ):
 	"""Extracts the dependencies of the given files."""
 	if isinstance(args, str): args = [args]
 	if mode == Tracker:
-		tracker = Tracker()
+		tracker = Tracker(cachePath=cache)
 		res  = None
 		for _ in args:
 			r = (tracker.fromPath(_, recursive=recursive))
@@ -61,6 +61,8 @@ def command( args, name=None ):
 			help="Finds the files corresponding to the given symbols (find mode)")
 	oparser.add_argument("-s", "--separator",      dest="sep",    action="store", default="\t",
 			help="Sets the field separator in output")
+	oparser.add_argument("-c", "--cache",     type=str,  dest="cache",  default=None,
+			help="Caches parsed files in the given file, reparsing only the modified ones")
 	# We create the parse and register the options
 	args     = oparser.parse_args(args=args)
 	out      = sys.stdout
@@ -104,7 +106,7 @@ def command( args, name=None ):
 			args.files = paths
 	# === TRACKER =============================================================
 	elif args.recursive or args.list:
-		res = run(args.files, recursive=args.recursive, mode=Tracker)
+		res = run(args.files, recursive=args.recursive, mode=Tracker, cache=args.cache)
 		if not res:
 			logging.error("Command returned empty result")
 		elif "requires" not in res:
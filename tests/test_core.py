@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+# encoding=utf8 ---------------------------------------------------------------
+# Project           : deparse
+# -----------------------------------------------------------------------------
+# Author            : FFunction
+# License           : BSD License
+# -----------------------------------------------------------------------------
+
+import os, re, sys, json, shutil, tempfile, unittest
+
+BASE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(os.path.dirname(BASE), "src"))
+
+from deparse.core import ResolveContext, LineParser, Tracker, Resolver, C, JavaScript, Sugar, Paml, CSS, PCSS, Block, PARSERS, _nativeText
+
+class LinePrefix(unittest.TestCase):
+
+	def testLines( self ):
+		"""The prefixes of the parsers' `LINES`."""
+		prefixes = lambda _:dict((k, _.LinePrefix(v)) for k, v in _.LINES.items())
+		self.assertEqual(prefixes(C), {"onInclude":"#include"})
+		self.assertEqual(prefixes(JavaScript), {"onRequire":None, "onImport":"import", "onGoogleProvide":"goog.", "onGoogleRequire":"goog.require"})
+		self.assertEqual(prefixes(Sugar), {"onModule":"@module", "onSugar2":"@feature", "onImport":"@import"})
+		self.assertEqual(prefixes(Paml), {
+			"onLinkTag":"<link(", "onJavaScriptTag":"<script(", "onJavaScriptRequire":"@",
+			"onJavaScriptGModule":"@", "onCSSRequire":"@", "onComponent":None, "onInclude":"%include",
+		})
+		self.assertEqual(prefixes(CSS), {"onImport":"@import", "onURL":None})
+		self.assertEqual(prefixes(PCSS), {"onModule":"@module", "onInclude":"@include", "onImport":"@import", "onURL":None})
+		self.assertEqual(prefixes(Block), {"onDirective":"@", "onContent":None})
+
+	def testExpressions( self ):
+		for expr, prefix in (
+			("^foo",          "foo"),
+			("^\\s*#include",  "#include"),
+			("^\\t+@import",   "@import"),
+			("^\\.x",          ".x"),
+			("^foo\\|bar",     "foo|bar"),
+			("^ab+c",         "ab"),
+			("^ab*c",         "a"),
+			("^ab?c",         "a"),
+			("^ab{2}",        "a"),
+			("^a?b",          None),
+			("^.*url",        None),
+			("^(foo|bar)",    None),
+			("^foo(a|b)",     "foo"),
+			("^foo|bar",      None),
+			("^foo\\\\|bar",   None),
+			("^foo[(]x|bar",  None),
+			("^foo[)]x|bar",  None),
+			("^foo[|]x",      "foo"),
+			("^foo[]|]x",     "foo"),
+			("^foo[^]|]x",    "foo"),
+			("^foo[]]|bar",   None),
+		):
+			self.assertEqual(LineParser.LinePrefix(expr), prefix, expr)
+
+class Glob(unittest.TestCase):
+
+	def setUp( self ):
+		self.dir = tempfile.mkdtemp()
+		os.mkdir(os.path.join(self.dir, "sub"))
+		for name in ("a-1.js", "a-2.js", ".a-3.js", "b.sjs", "sub/c.css"):
+			open(os.path.join(self.dir, name), "w").close()
+
+	def tearDown( self ):
+		shutil.rmtree(self.dir)
+
+	def testGlob( self ):
+		parser = LineParser()
+		glob   = lambda *_:[os.path.relpath(p, self.dir) for p in parser._glob([self.dir], *_)]
+		self.assertEqual(glob("a-*.js"), ["a-1.js", "a-2.js"])
+		self.assertEqual(glob(".a-*.js"), [".a-3.js"])
+		self.assertEqual(glob("b.sjs", "missing.sjs"), ["b.sjs"])
+		self.assertEqual(glob("*/c.css", "sub/*.css"), [os.path.join("sub", "c.css")] * 2)
+		self.assertEqual(parser._glob([os.path.join(self.dir, "missing")], "*.js"), [])
+		# Directory listings are cached by the parser's `dirCache`
+		open(os.path.join(self.dir, "a-4.js"), "w").close()
+		self.assertEqual(glob("a-*.js"), ["a-1.js", "a-2.js"])
+		parser.dirCache = {}
+		self.assertEqual(glob("a-*.js"), ["a-1.js", "a-2.js", "a-4.js"])
+
+class SortRequires(unittest.TestCase):
+
+	def testCycleDependencies( self ):
+		"""Modules depending on a cycle are loaded after the cycle."""
+		tracker = Tracker()
+		tracker.nodes = {"A":["B"], "B":["C"], "C":["B"], "D":["A"]}
+		self.assertEqual(tracker._sortRequires(["A"]),      ["C", "B", "A"])
+		self.assertEqual(tracker._sortRequires(["A", "D"]), ["C", "B", "A", "D"])
+
+	def testRecursiveModules( self ):
+		"""The `reca`/`recb` modules import each other, and `app` imports `reca`."""
+		tracker = Tracker()
+		for name in ("reca.sjs", "recb.sjs"):
+			parser = Sugar().parsePath(os.path.join(BASE, name))
+			for item in parser.provides:
+				tracker.nodes[item] = parser.requires
+		app = ("js:module", "app")
+		tracker.nodes[app] = [("js:module", "reca")]
+		loaded = tracker._sortRequires([app])
+		self.assertEqual(sorted(loaded), sorted([app, ("js:module", "reca"), ("js:module", "recb")]))
+		self.assertEqual(loaded[-1], app)
+
+class ParseCache(unittest.TestCase):
+
+	def setUp( self ):
+		self.dir   = tempfile.mkdtemp()
+		self.path  = os.path.join(self.dir, "a.sjs")
+		self.cache = os.path.join(self.dir, "cache.json")
+		with open(self.path, "w") as f:
+			f.write("@module a\n@import b\n")
+
+	def tearDown( self ):
+		shutil.rmtree(self.dir)
+
+	def provides( self ):
+		return Tracker(cachePath=self.cache).fromPath(self.path)["provides"]
+
+	def testCachedResults( self ):
+		"""Unchanged files are not parsed again, and the cache is versioned."""
+		self.assertEqual(self.provides(), [(self.path, [("js:module", "a")])])
+		self.assertEqual(sorted(os.listdir(self.dir)), ["a.sjs", "cache.json"])
+		with open(self.cache) as f:
+			data = json.load(f)
+		self.assertEqual(data["version"], Tracker.CACHE_VERSION)
+		# We tamper with the cache entry to make sure it is used
+		data["files"][os.path.abspath(self.path)]["provides"] = [["js:module", "cached"]]
+		with open(self.cache, "w") as f:
+			json.dump(data, f)
+		self.assertEqual(self.provides(), [(self.path, [("js:module", "cached")])])
+		# Caches from another version are dropped
+		data["version"] = Tracker.CACHE_VERSION + 1
+		with open(self.cache, "w") as f:
+			json.dump(data, f)
+		self.assertEqual(self.provides(), [(self.path, [("js:module", "a")])])
+
+	def testMissingFile( self ):
+		"""Missing files are skipped by the cache."""
+		tracker = Tracker(cachePath=self.cache)
+		tracker.fromPath(os.path.join(self.dir, "missing.sjs"))
+		self.assertFalse(os.path.exists(self.cache))
+
+class Scan(unittest.TestCase):
+	"""Scanning files and texts gives the same results as matching the
+	`LINES` expressions on each line."""
+
+	PARSERS = (C, JavaScript, Sugar, CSS, PCSS, Block)
+	SAMPLES = (
+		b"",
+		b"@module a\n@import b, c\n",
+		b"@module a\r\n@import b, c\r\n",
+		b"@module a\r@import b\r",
+		b"@include\x1f@feature;\n@import\x1c'a.css'\n",
+		b"@import \xc3\xa9t\xc3\xa9\n",
+		b"#include <x.h>\n  #include\t\"y.h\"\n#include\x1d<z.h>",
+		b"var a = require('x');\nimport * as y from \"z\";\nimport './w'\n",
+		b"  @import url(a.css)\n\tbody { background: url('i.png?v=1') }",
+		b"@sugar2\n\t@module s\n\t@import t\n@import a.js b.js\n",
+	)
+
+	def setUp( self ):
+		self.dir  = tempfile.mkdtemp()
+
+	def tearDown( self ):
+		shutil.rmtree(self.dir)
+
+	def reference( self, parserType, data, path ):
+		parser = parserType()
+		parser.path = path
+		parser.onParse(path, None)
+		text  = _nativeText(data).replace("\r\n", "\n").replace("\r", "\n")
+		lines = text.split("\n")
+		for line in [_ + "\n" for _ in lines[:-1]] + [_ for _ in lines[-1:] if _]:
+			for name, expr in parserType.LINES.items():
+				match = re.match(expr, line)
+				if match:
+					getattr(parser, name)(line, match)
+					break
+		parser.onParseEnd(path, None)
+		return parser.provides, parser.requires
+
+	def testScan( self ):
+		for i, data in enumerate(self.SAMPLES):
+			path = os.path.join(self.dir, "{0}.txt".format(i))
+			with open(path, "wb") as f:
+				f.write(data)
+			for parser_type in self.PARSERS:
+				expected = self.reference(parser_type, data, path)
+				parser   = parser_type().parsePath(path)
+				self.assertEqual((parser.provides, parser.requires), expected, (parser_type, data))
+				if data and b"\r" not in data:
+					parser = parser_type()
+					parser.path = path
+					parser.parse(_nativeText(data), path=path)
+					parser.onParseEnd(path, None)
+					self.assertEqual((parser.provides, parser.requires), expected, (parser_type, data))
+
+class Workers(unittest.TestCase):
+
+	def setUp( self ):
+		self.dir = tempfile.mkdtemp()
+		for name, text in (("a", "@module a\n@import b, c\n"), ("b", "@module b\n@import c\n"), ("c", "@module c\n")):
+			with open(os.path.join(self.dir, name + ".sjs"), "w") as f:
+				f.write(text)
+
+	def tearDown( self ):
+		shutil.rmtree(self.dir)
+
+	def testProcesses( self ):
+		"""Setting `processes` alone parses files in a process pool."""
+		self.assertEqual(Tracker().workers, 1)
+		self.assertEqual(Tracker(processes=True).workers, None)
+		self.assertEqual(Tracker(workers=2, processes=True).workers, 2)
+		path = os.path.join(self.dir, "a.sjs")
+		cwd  = os.getcwd()
+		os.chdir(self.dir)
+		try:
+			expected = Tracker().fromPath(path, recursive=True)
+			for tracker in (Tracker(workers=2), Tracker(processes=True)):
+				self.assertEqual(tracker.fromPath(path, recursive=True), expected)
+		finally:
+			os.chdir(cwd)
+
+class ModulePatterns(unittest.TestCase):
+
+	def testOverriddenPatterns( self ):
+		"""Subclasses overriding `MODULE_PATTERNS` do not share their patterns."""
+		class Other(LineParser):
+			MODULE_PATTERNS = dict(LineParser.MODULE_PATTERNS, **{"css:module":(("{0}.less",), ())})
+		self.assertEqual(Other()._modulePatterns("css:module", "base"), ("base", ("base.less",), ()))
+		self.assertEqual(LineParser()._modulePatterns("css:module", "base"), ("base", ("base.css",), ("base*.pcss",)))
+		self.assertEqual(Other()._modulePatterns("css:module", "base"), ("base", ("base.less",), ()))
+
+	def testBoundedCache( self ):
+		parser = LineParser()
+		for i in range(LineParser.MODULE_PATTERNS_CACHE_SIZE + 1):
+			parser._modulePatterns("js:module", "m{0}".format(i))
+		self.assertTrue(len(LineParser.MODULE_PATTERNS_CACHE) <= LineParser.MODULE_PATTERNS_CACHE_SIZE)
+		self.assertEqual(parser._modulePatterns("js:module", "a.b")[0], "a/b")
+
+class ParseAttributes(unittest.TestCase):
+
+	def testAttributes( self ):
+		parse = Paml()._parseAttributes
+		self.assertEqual(parse(""), {})
+		self.assertEqual(parse("flag"), {"flag":None})
+		self.assertEqual(parse("rel=stylesheet,href=\"a.css\""), {"rel":"stylesheet", "href":"a.css"})
+		self.assertEqual(parse("ns::name='v,w',b"), {"ns:name":"v,w", "b":None})
+		self.assertEqual(parse("?x=(1"), {"?x":"(1"})
+
+	def testMalformed( self ):
+		for attributes in ("a,,b", "a,", "=x", "a b"):
+			self.assertRaises(AssertionError, Paml()._parseAttributes, attributes)
+
+class ResolverFind(unittest.TestCase):
+
+	def testOverriddenResolve( self ):
+		"""A registered parser that overrides `_resolve` is queried."""
+		class Custom(Sugar):
+			def _resolve( self, resolved, item, path, dirs ):
+				return resolved + [("custom:file", "X-" + item[1])]
+		parsers = dict(PARSERS, zz=Custom)
+		matches = Resolver(parsers).find(["nothing"], BASE)
+		self.assertEqual(matches["nothing"], [("custom:file", "X-nothing")])
+
+class TypeDirs(unittest.TestCase):
+
+	def testSharedContext( self ):
+		"""Parsers with different `PATHS` can share a resolve context."""
+		class Other(LineParser):
+			PATHS = dict(LineParser.PATHS, **{"js:module":["vendor"]})
+		ctx = ResolveContext(BASE, cwd=BASE)
+		self.assertEqual(LineParser()._typeDirs("js:module", ctx)[0], os.path.join(BASE, "lib/js"))
+		self.assertEqual(Other()._typeDirs("js:module", ctx)[0], os.path.join(BASE, "vendor"))
+		self.assertEqual(LineParser()._typeDirs("js:module", ctx)[0], os.path.join(BASE, "lib/js"))
+
+if __name__ == "__main__":
+	unittest.main()
+
+# EOF - vim: ts=4 sw=4 noet